@@ -14,6 +14,11 @@ from src.assets_utils import (
 )
 from src.consts import HOMICIDES_PER_CAPITA_PER_CAPITAL_FILENAME
 from src.utils import default_parser
+from src.validation import SchemaViolation, ValidationReport
+
+# Window of population data years used to interpolate yearly populations.
+POPULATION_MIN_YEAR = 2000
+POPULATION_MAX_YEAR = 2020
 
 
 def convert_value_range(
@@ -29,7 +34,11 @@ def convert_value_range(
 def generate_year_to_pop_fn(
     population: pd.Series,
 ) -> Callable[[np.ndarray], np.ndarray]:
-    """Return a function that linearly interpolates year to population."""
+    """Return a function that linearly interpolates year to population.
+
+    Requested years must lie within the years in `population`, which
+    `validate_population_coverage` checks for all capitals beforehand.
+    """
 
     # Available anchors that we'll use to interpolate intermediate years.
     years = np.array(population.index)
@@ -49,11 +58,6 @@ def generate_year_to_pop_fn(
     def piecewise_fn(year_req: np.ndarray) -> np.ndarray:
         """Return the interpolated population for the requested years."""
         years = np.expand_dims(population.index, -1)
-
-        assert np.logical_and(
-            min(years) <= year_req, year_req <= max(years)
-        ).all(), f"At least one requested year in {year_req} is out of range."
-
         condlist = np.logical_and(years[:-1] <= year_req, year_req <= years[1:])
 
         return np.piecewise(year_req, condlist, funclist)
@@ -61,15 +65,77 @@ def generate_year_to_pop_fn(
     return piecewise_fn
 
 
+def validate_population_coverage(
+    population_df: pd.DataFrame,
+    homicides_df: pd.DataFrame,
+    min_year: int,
+    max_year: int,
+) -> ValidationReport:
+    """Check that population data allows interpolating every homicide year.
+
+    Args:
+        population_df: Population per capital, with years as columns.
+        homicides_df: Number of homicides per capital, with integer years as
+            columns.
+        min_year: The minimum year of population data used to interpolate.
+        max_year: The maximum year of population data used to interpolate.
+
+    Returns:
+        A report with the capitals that lack homicide data or whose population
+        data does not span all homicide years.
+    """
+    years = population_df.columns.astype(np.int64)
+    used = (years >= min_year) & (years <= max_year)
+    used_years = years[used].to_numpy()
+    available = population_df.loc[:, used].notna().to_numpy()
+    first_year = np.where(available, used_years, np.iinfo(np.int64).max).min(
+        axis=1
+    )
+    last_year = np.where(available, used_years, np.iinfo(np.int64).min).max(
+        axis=1
+    )
+
+    violations = []
+    no_homicides = ~population_df.index.isin(homicides_df.index)
+    uncovered = (first_year > homicides_df.columns.min()) | (
+        last_year < homicides_df.columns.max()
+    )
+    for mask, check in (
+        (no_homicides, "no homicide data"),
+        (uncovered, "population does not span homicide years"),
+    ):
+        if mask.any():
+            violations.append(
+                SchemaViolation(
+                    column=population_df.index.name,
+                    check=check,
+                    num_rows=int(mask.sum()),
+                    examples=tuple(population_df.index[mask][:3].tolist()),
+                )
+            )
+    return ValidationReport(
+        "population and homicides", len(population_df), violations
+    )
+
+
 def export_homicides_per_capita(assets_dir: Path, outputs_dir: Path) -> None:
     """Plot the population trend for all capitals from 1980 to 2020."""
     population_df = population_df_from_csv(assets_dir)
     homicides_df = homicides_df_from_csv(assets_dir)
     homicides_df.columns = homicides_df.columns.astype(np.int64)
+    validate_population_coverage(
+        population_df,
+        homicides_df,
+        min_year=POPULATION_MIN_YEAR,
+        max_year=POPULATION_MAX_YEAR,
+    ).raise_if_invalid()
+
     homicides_per_capita_dict: Dict[str, List[Real]] = {}
     for county_code, population_per_year in population_df.iterrows():
         population_per_year = parse_population_values(
-            population_per_year, min_year=2000
+            population_per_year,
+            min_year=POPULATION_MIN_YEAR,
+            max_year=POPULATION_MAX_YEAR,
         )
 
         # Create function that estimates population for current county.
@@ -0,0 +1,224 @@
+"""Precomputed IDEB aggregates over Brazil's geographic hierarchy.
+
+The cube stores the count, sum and sum of squares of IDEB scores for every
+(geographic unit, network, school level, year) cell, at every level of the
+Brazil > region > state > county hierarchy. Since these moments are additive,
+means, variances and rollups are O(1) lookups, and new data is merged in
+without recomputing existing cells.
+"""
+from enum import Enum
+from typing import Dict, Hashable, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.assets_utils import (
+    IDEB_MERGED_SCHEMA,
+    CapitalProperty,
+    EducationNetwork,
+    SchoolLevel,
+)
+from src.validation import validate_df
+
+BRAZIL = "Brasil"
+
+
+class GeoLevel(Enum):
+    """Levels of the geographic hierarchy, from the coarsest to the finest.
+
+    Values are the matching column names in the merged IDEB data, which mirror
+    `CapitalProperty.REGION`, `CapitalProperty.STATE_ABBREV` and
+    `CapitalProperty.COUNTY_CODE`.
+    """
+
+    COUNTRY = BRAZIL
+    REGION = CapitalProperty.REGION.value
+    STATE = "Sigla da UF"
+    COUNTY = "Código do Município"
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+
+NETWORK_COLUMN = "Rede"
+YEAR_COLUMN = "Ano"
+SCORE_COLUMN = "IDEB"
+
+CellKey = Tuple[GeoLevel, Hashable, EducationNetwork, SchoolLevel, int]
+
+
+class CubeCell(NamedTuple):
+    """Sufficient statistics of the IDEB scores in a cell of the cube."""
+
+    num_scores: int
+    total: float
+    total_sq: float
+
+    @property
+    def mean(self) -> float:
+        """Mean score, or NaN for an empty cell."""
+        return self.total / self.num_scores if self.num_scores else np.nan
+
+    @property
+    def variance(self) -> float:
+        """Unbiased sample variance, or NaN for less than two scores."""
+        if self.num_scores < 2:
+            return np.nan
+        correction = self.total * self.total / self.num_scores
+        # Cancellation may leave identical scores slightly below zero.
+        return max(0.0, (self.total_sq - correction) / (self.num_scores - 1))
+
+
+EMPTY_CELL = CubeCell(0, 0.0, 0.0)
+
+
+class AggregationCube:
+    """IDEB moments per geographic unit, network, school level and year."""
+
+    def __init__(self) -> None:
+        self._cells: Dict[CellKey, CubeCell] = {}
+        # Parent unit of each unit, at the level right above it.
+        self._parents: Dict[Tuple[GeoLevel, Hashable], Hashable] = {}
+
+    @classmethod
+    def from_ideb_merged(
+        cls, ideb_merged: Dict[SchoolLevel, pd.DataFrame]
+    ) -> "AggregationCube":
+        """Build a cube from merged IDEB data for each school level.
+
+        Args:
+            ideb_merged: Dataframes in the layout exported by
+                `scripts.merge_ideb`, keyed by school level.
+        """
+        cube = cls()
+        for school_level, ideb_df in ideb_merged.items():
+            cube.update(ideb_df, school_level)
+        return cube
+
+    def update(self, ideb_df: pd.DataFrame, school_level: SchoolLevel) -> None:
+        """Add the scores in `ideb_df` to the cube.
+
+        Moments are added to any existing cell, so `ideb_df` should only hold
+        scores not yet in the cube, such as those of a newly released year.
+        Missing scores, which must be NaN as in `ideb_merged_df_from_csv`,
+        are ignored.
+
+        Args:
+            ideb_df: Dataframe in the layout exported by `scripts.merge_ideb`.
+            school_level: School level of the scores in `ideb_df`.
+
+        Raises:
+            SchemaError: If `ideb_df` does not conform to `IDEB_MERGED_SCHEMA`,
+                e.g. if a row lacks its region, state or network.
+        """
+        validate_df(ideb_df, IDEB_MERGED_SCHEMA).raise_if_invalid()
+        ideb_df = ideb_df.dropna(subset=[SCORE_COLUMN]).assign(
+            **{
+                GeoLevel.COUNTRY.value: BRAZIL,
+                YEAR_COLUMN: ideb_df[YEAR_COLUMN].astype(np.int64),
+                SCORE_COLUMN: ideb_df[SCORE_COLUMN].astype(np.float64),
+            }
+        )
+        ideb_df["_score_sq"] = ideb_df[SCORE_COLUMN] ** 2
+
+        levels = list(GeoLevel)
+        for parent, child in zip(levels[:-1], levels[1:]):
+            pairs = ideb_df[[child.value, parent.value]].drop_duplicates()
+            self._parents.update(
+                ((child, unit), parent_unit)
+                for unit, parent_unit in pairs.itertuples(index=False)
+            )
+
+        for geo_level in GeoLevel:
+            moments = ideb_df.groupby(
+                [geo_level.value, NETWORK_COLUMN, YEAR_COLUMN]
+            ).agg(
+                num_scores=(SCORE_COLUMN, "size"),
+                total=(SCORE_COLUMN, "sum"),
+                total_sq=("_score_sq", "sum"),
+            )
+            for (unit, network, year), num_scores, total, total_sq in zip(
+                moments.index,
+                moments["num_scores"].to_numpy(),
+                moments["total"].to_numpy(),
+                moments["total_sq"].to_numpy(),
+            ):
+                key = (
+                    geo_level,
+                    unit,
+                    EducationNetwork(network),
+                    school_level,
+                    int(year),
+                )
+                cell = self._cells.get(key, EMPTY_CELL)
+                self._cells[key] = CubeCell(
+                    cell.num_scores + int(num_scores),
+                    cell.total + float(total),
+                    cell.total_sq + float(total_sq),
+                )
+
+    def cell(
+        self,
+        geo_level: GeoLevel,
+        unit: Hashable,
+        network: EducationNetwork,
+        school_level: SchoolLevel,
+        year: int,
+    ) -> CubeCell:
+        """Return the moments of a cell, which are empty if it has no scores.
+
+        Args:
+            geo_level: Level of the geographic hierarchy of `unit`.
+            unit: Region name, state abbreviation or county code, depending on
+                `geo_level`. Ignored for `GeoLevel.COUNTRY`.
+            network: Education network of the scores.
+            school_level: School level of the scores.
+            year: Year of the scores.
+        """
+        if geo_level is GeoLevel.COUNTRY:
+            unit = BRAZIL
+        return self._cells.get(
+            (geo_level, unit, network, school_level, year), EMPTY_CELL
+        )
+
+    def parent(self, geo_level: GeoLevel, unit: Hashable) -> Hashable:
+        """Return the unit right above `unit` in the hierarchy.
+
+        Raises:
+            KeyError: If `unit` is not in the cube, or is the whole country.
+        """
+        return self._parents[(geo_level, unit)]
+
+    def to_frame(self, geo_level: GeoLevel) -> pd.DataFrame:
+        """Return counts, means and variances of every cell at `geo_level`.
+
+        The returned dataframe has one column per level of the hierarchy up
+        to `geo_level`, so that, e.g., state aggregates can still be grouped
+        by region.
+        """
+        levels = list(GeoLevel)[1 : list(GeoLevel).index(geo_level) + 1]
+        records = []
+        for key, cell in self._cells.items():
+            cell_level, unit, network, school_level, year = key
+            if cell_level is not geo_level:
+                continue
+            units = [unit]
+            for ancestor in reversed(levels[1:]):
+                units.append(self._parents[(ancestor, units[-1])])
+            record = dict(
+                zip((level.value for level in levels), reversed(units))
+            )
+            if not levels:
+                record[GeoLevel.COUNTRY.value] = BRAZIL
+            record.update(
+                {
+                    NETWORK_COLUMN: network.value,
+                    "Nível": school_level.value,
+                    YEAR_COLUMN: year,
+                    "count": cell.num_scores,
+                    "mean": cell.mean,
+                    "variance": cell.variance,
+                }
+            )
+            records.append(record)
+        return pd.DataFrame.from_records(records)
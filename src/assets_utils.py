@@ -10,18 +10,50 @@ from src.consts import (
     BRAZILIAN_CAPITALS_FILENAME,
     HOMICIDES_PER_CAPITAL_FILENAME,
     IDEB_CAPITALS_FILENAME_FORMAT,
+    IDEB_MERGED_FILENAME_FORMAT,
     IDEB_SCHOOL_FILENAME_FORMAT,
     POPULATION_PER_CAPITAL_FILENAME,
 )
+from src.validation import AssetSchema, ColumnSchema, ColumnType, validate_df
+
+# IBGE county codes have 7 digits, the first two being the state code.
+COUNTY_CODE_SCHEMA = ColumnSchema(
+    ColumnType.INTEGER, min_value=1_100_000, max_value=5_399_999
+)
+STATE_ABBREV_SCHEMA = ColumnSchema(ColumnType.STRING, pattern=r"[A-Z]{2}")
+REGIONS = frozenset({"Norte", "Nordeste", "Centro-Oeste", "Sudeste", "Sul"})
+
+POPULATION_SCHEMA = AssetSchema(
+    name=POPULATION_PER_CAPITAL_FILENAME,
+    columns={
+        "Código": COUNTY_CODE_SCHEMA,
+        "Capital": ColumnSchema(ColumnType.STRING),
+    },
+    year_columns=ColumnSchema(
+        ColumnType.PT_BR_INTEGER, nullable=True, min_value=1
+    ),
+    na_values=("...",),
+    unique_key=("Código",),
+)
 
 
 def population_df_from_csv(assets_dir: Path) -> pd.DataFrame:
-    """Retrieve population dataframe from csv file."""
+    """Retrieve population dataframe from csv file.
+
+    Population values are kept as str, since they use '.' as the thousands
+    separator and would otherwise be misread as floats by pandas.
+
+    Raises:
+        SchemaError: If the csv file does not conform to `POPULATION_SCHEMA`.
+    """
     population_df = pd.read_csv(
         assets_dir / POPULATION_PER_CAPITAL_FILENAME,
         index_col=0,
-        na_values="...",
+        dtype=str,
+        na_values=list(POPULATION_SCHEMA.na_values),
     )
+    validate_df(population_df, POPULATION_SCHEMA).raise_if_invalid()
+    population_df.index = population_df.index.astype(np.int64)
     population_df.drop("Capital", axis=1, inplace=True)
     return population_df
 
@@ -33,6 +65,9 @@ def parse_population_values(
 ) -> pd.Series:
     """Parse population values after `year` (inclusive).
 
+    Population years are expected to be sorted, which `POPULATION_SCHEMA`
+    enforces at load time, so out of range years simply select fewer values.
+
     Args:
         population: Series with population per year, where year is the str index
             of the series and population is represented as str with '.' as the
@@ -45,10 +80,6 @@ def parse_population_values(
     Returns:
         A series with the parsed series of integer population values for
         relevant years.
-
-    Raises:
-        KeyError: If either min_year or max_year are not a valid year in the
-            dataset.
     """
     # Keep only relevant years from series.
     population.index = population.index.astype(np.int64)
@@ -74,10 +105,30 @@ class CapitalProperty(Enum):
     REGION = "Regiões"
 
 
+BRAZILIAN_CAPITALS_SCHEMA = AssetSchema(
+    name=BRAZILIAN_CAPITALS_FILENAME,
+    columns={
+        CapitalProperty.COUNTY_CODE.value: COUNTY_CODE_SCHEMA,
+        CapitalProperty.NAME.value: ColumnSchema(ColumnType.STRING),
+        CapitalProperty.STATE.value: ColumnSchema(ColumnType.STRING),
+        CapitalProperty.STATE_ABBREV.value: STATE_ABBREV_SCHEMA,
+        CapitalProperty.REGION.value: ColumnSchema(
+            ColumnType.STRING, allowed_values=REGIONS
+        ),
+    },
+    unique_key=(CapitalProperty.COUNTY_CODE.value,),
+)
+
+
 def brazil_capitals_df_from_csv(
     assets_dir: Path, usecols: Set[CapitalProperty] = None
 ) -> pd.DataFrame:
-    """Retrieve Brazilian capitals info dataframe from csv file."""
+    """Retrieve Brazilian capitals info dataframe from csv file.
+
+    Raises:
+        SchemaError: If the used columns don't conform to
+            `BRAZILIAN_CAPITALS_SCHEMA`.
+    """
     if usecols is not None:
         assert CapitalProperty.COUNTY_CODE not in usecols, (
             "The county code property is always used as an index, so it's "
@@ -94,15 +145,40 @@ def brazil_capitals_df_from_csv(
         usecols=usecol_names,
         index_col=0,
     )
+    schema = BRAZILIAN_CAPITALS_SCHEMA._replace(
+        columns={
+            name: col_schema
+            for name, col_schema in BRAZILIAN_CAPITALS_SCHEMA.columns.items()
+            if name in usecol_names
+        }
+    )
+    validate_df(brazil_capitals_df, schema).raise_if_invalid()
     return brazil_capitals_df
 
 
+HOMICIDES_SCHEMA = AssetSchema(
+    name=HOMICIDES_PER_CAPITAL_FILENAME,
+    columns={
+        "Sigla": STATE_ABBREV_SCHEMA,
+        "Código": COUNTY_CODE_SCHEMA,
+        "Município": ColumnSchema(ColumnType.STRING),
+    },
+    year_columns=ColumnSchema(ColumnType.INTEGER, min_value=0),
+    unique_key=("Código",),
+)
+
+
 def homicides_df_from_csv(assets_dir: Path) -> pd.DataFrame:
-    """Retrieve capitals number of homicides dataframe from csv file."""
+    """Retrieve capitals number of homicides dataframe from csv file.
+
+    Raises:
+        SchemaError: If the csv file does not conform to `HOMICIDES_SCHEMA`.
+    """
     homicides_df = pd.read_csv(
         assets_dir / HOMICIDES_PER_CAPITAL_FILENAME,
         index_col=1,
     )
+    validate_df(homicides_df, HOMICIDES_SCHEMA).raise_if_invalid()
     homicides_df.drop(["Sigla", "Município"], axis=1, inplace=True)
     return homicides_df
 
@@ -130,6 +206,39 @@ class EducationNetwork(Enum):
         return str(self.value)
 
 
+# IDEB scores range from 0 to 10, and '-' marks missing scores.
+IDEB_SCORE_SCHEMA = ColumnSchema(
+    ColumnType.FLOAT, nullable=True, min_value=0, max_value=10
+)
+IDEB_NA_VALUES = ("-",)
+
+IDEB_SCHEMA = AssetSchema(
+    name=IDEB_SCHOOL_FILENAME_FORMAT,
+    columns={
+        "Sigla da UF": STATE_ABBREV_SCHEMA,
+        "Código do Município": COUNTY_CODE_SCHEMA,
+        "Nome do Município": ColumnSchema(ColumnType.STRING),
+        "Rede": ColumnSchema(
+            ColumnType.STRING,
+            allowed_values=frozenset(net.value for net in EducationNetwork),
+        ),
+    },
+    year_columns=IDEB_SCORE_SCHEMA,
+    year_column_pattern=r"IDEB(\d{4})\(N x P\)",
+    na_values=IDEB_NA_VALUES,
+    unique_key=("Código do Município", "Rede"),
+)
+
+IDEB_CAPITALS_SCHEMA = AssetSchema(
+    name=IDEB_CAPITALS_FILENAME_FORMAT,
+    columns={"Código do Município": COUNTY_CODE_SCHEMA},
+    year_columns=IDEB_SCORE_SCHEMA,
+    na_values=IDEB_NA_VALUES,
+    unique_key=("Código do Município",),
+    allow_extra_columns=True,
+)
+
+
 def ideb_column_range(school_level: SchoolLevel) -> str:
     """Return the respective column range for IDEB data."""
     if school_level is SchoolLevel.ELEMENTARY:
@@ -146,15 +255,24 @@ def ideb_column_range(school_level: SchoolLevel) -> str:
 def ideb_df_from_ods(
     assets_dir: Path, school_level: SchoolLevel
 ) -> pd.DataFrame:
-    """Return IDEB data for all counties and the given `school_level`."""
+    """Return IDEB data for all counties and the given `school_level`.
+
+    Raises:
+        SchemaError: If the parsed data does not conform to `IDEB_SCHEMA`.
+    """
+    ideb_filepath = assets_dir / IDEB_SCHOOL_FILENAME_FORMAT.format(
+        school_level.value
+    )
     ideb_df = pd.read_excel(
-        assets_dir / IDEB_SCHOOL_FILENAME_FORMAT.format(school_level.value),
+        ideb_filepath,
         engine="odf",
         index_col=[0, 1],
         usecols="A,B,C,D," + ideb_column_range(school_level),
         skipfooter=3,
         skiprows=lambda r: r <= 9 and r != 6,  # Keep 7th row as header.
     )
+    schema = IDEB_SCHEMA._replace(name=ideb_filepath.name)
+    validate_df(ideb_df, schema).raise_if_invalid()
     return ideb_df
 
 
@@ -172,12 +290,20 @@ def ideb_capital_csv_filename(
 def ideb_capital_df_from_csv(
     outputs_dir: Path, school_level: SchoolLevel, network: EducationNetwork
 ) -> pd.DataFrame:
-    """Return IDEB data for Brazilian capitals."""
+    """Return IDEB data for Brazilian capitals.
+
+    Raises:
+        SchemaError: If the csv file does not conform to
+            `IDEB_CAPITALS_SCHEMA`.
+    """
+    ideb_filename = ideb_capital_csv_filename(school_level, network)
     ideb_capital_df = pd.read_csv(
-        outputs_dir / ideb_capital_csv_filename(school_level, network),
+        outputs_dir / ideb_filename,
         index_col=0,
-        na_values="-",
+        na_values=list(IDEB_CAPITALS_SCHEMA.na_values),
     )
+    schema = IDEB_CAPITALS_SCHEMA._replace(name=str(ideb_filename))
+    validate_df(ideb_capital_df, schema).raise_if_invalid()
     return ideb_capital_df
 
 
@@ -186,5 +312,48 @@ def ideb_merged_to_csv(
 ):
     """Save totally parsed ideb file."""
     ideb_merged.to_csv(
-        outputs_dir / f"ideb_merged_{school_level.name.lower()}.csv"
+        outputs_dir
+        / IDEB_MERGED_FILENAME_FORMAT.format(school_level.name.lower())
+    )
+
+
+# Rows missing any key would be left out of some aggregates of the
+# region > state > county hierarchy only, so rollups would stop adding up.
+IDEB_MERGED_SCHEMA = AssetSchema(
+    name=IDEB_MERGED_FILENAME_FORMAT,
+    columns={
+        "Código do Município": COUNTY_CODE_SCHEMA,
+        "Sigla da UF": STATE_ABBREV_SCHEMA,
+        CapitalProperty.REGION.value: ColumnSchema(
+            ColumnType.STRING, allowed_values=REGIONS
+        ),
+        "Rede": ColumnSchema(
+            ColumnType.STRING,
+            allowed_values=frozenset(net.value for net in EducationNetwork),
+        ),
+        "Ano": ColumnSchema(ColumnType.INTEGER),
+        "IDEB": IDEB_SCORE_SCHEMA,
+    },
+    allow_extra_columns=True,
+)
+
+
+def ideb_merged_df_from_csv(
+    outputs_dir: Path, school_level: SchoolLevel
+) -> pd.DataFrame:
+    """Return totally parsed ideb data for `school_level`.
+
+    Raises:
+        SchemaError: If the csv file does not conform to `IDEB_MERGED_SCHEMA`.
+    """
+    ideb_merged_filename = IDEB_MERGED_FILENAME_FORMAT.format(
+        school_level.name.lower()
+    )
+    ideb_merged = pd.read_csv(
+        outputs_dir / ideb_merged_filename,
+        index_col=0,
+        na_values=list(IDEB_NA_VALUES),
     )
+    schema = IDEB_MERGED_SCHEMA._replace(name=ideb_merged_filename)
+    validate_df(ideb_merged, schema).raise_if_invalid()
+    return ideb_merged
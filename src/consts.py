@@ -29,3 +29,9 @@ HOMICIDES_PER_CAPITA_PER_CAPITAL_FILENAME = "homicides_per_capita.pkl"
 
 # File generated by module sripts.parse_ideb
 IDEB_CAPITALS_FILENAME_FORMAT = "ideb_capitals_{}_{}.csv"
+
+# File generated by module sripts.merge_ideb
+IDEB_MERGED_FILENAME_FORMAT = "ideb_merged_{}.csv"
+
+# File generated by module src.vis.correlate
+CORRELATION_RESAMPLING_FILENAME = "correlation_ideb_vs_homicide_resampling.csv"
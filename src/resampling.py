@@ -0,0 +1,193 @@
+"""Bootstrap and permutation resampling for simple linear regressions.
+
+All resamples of a regression are drawn at once as a `(num_resamples,
+num_samples)` array of indices, so that every resampled regression is computed
+by the same batched NumPy operations instead of a Python loop.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+Seed = Union[int, Sequence[int]]
+
+
+class ResampledRegression(NamedTuple):
+    """Point estimates of a linear regression and their resampled statistics.
+
+    Confidence intervals come from the percentile bootstrap, and `pvalue` is
+    the two-sided permutation p-value for the null hypothesis of no
+    correlation between `x` and `y`, or NaN if `rvalue` is undefined.
+    """
+
+    slope: float
+    intercept: float
+    rvalue: float
+    slope_ci: Tuple[float, float]
+    intercept_ci: Tuple[float, float]
+    rvalue_ci: Tuple[float, float]
+    pvalue: float
+
+
+def bootstrap_indices(
+    rng: np.random.Generator, num_samples: int, num_resamples: int
+) -> np.ndarray:
+    """Return `num_resamples` rows of indices drawn with replacement."""
+    return rng.integers(num_samples, size=(num_resamples, num_samples))
+
+
+def permutation_indices(
+    rng: np.random.Generator, num_samples: int, num_resamples: int
+) -> np.ndarray:
+    """Return `num_resamples` rows, each a random permutation of indices."""
+    return np.argsort(rng.random((num_resamples, num_samples)), axis=1)
+
+
+def batched_linregress(
+    x: np.ndarray, y: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Fit one least squares line per row of `x` and `y`.
+
+    Args:
+        x: Array of shape `(..., num_samples)` with the independent variable.
+        y: Array with the same shape as `x` with the dependent variable.
+
+    Returns:
+        The slopes, intercepts and Pearson correlation coefficients of each
+        row. Rows where `x` or `y` are constant yield NaN values.
+    """
+    x_mean = x.mean(axis=-1, keepdims=True)
+    y_mean = y.mean(axis=-1, keepdims=True)
+    x_centered = x - x_mean
+    y_centered = y - y_mean
+
+    ss_xy = (x_centered * y_centered).sum(axis=-1)
+    ss_xx = (x_centered * x_centered).sum(axis=-1)
+    ss_yy = (y_centered * y_centered).sum(axis=-1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = ss_xy / ss_xx
+        rvalue = ss_xy / np.sqrt(ss_xx * ss_yy)
+    intercept = y_mean[..., 0] - slope * x_mean[..., 0]
+    return slope, intercept, rvalue
+
+
+def _percentile_interval(
+    values: np.ndarray, confidence: float
+) -> Tuple[float, float]:
+    """Return the percentile interval of `values`, ignoring NaN entries."""
+    if np.isnan(values).all():
+        return np.nan, np.nan
+    alpha = 100 * (1 - confidence) / 2
+    lower, upper = np.nanpercentile(values, [alpha, 100 - alpha])
+    return float(lower), float(upper)
+
+
+def resample_linregress(
+    x: np.ndarray,
+    y: np.ndarray,
+    num_resamples: int = 10_000,
+    confidence: float = 0.95,
+    seed: Optional[Seed] = None,
+) -> ResampledRegression:
+    """Estimate a linear regression with bootstrap CIs and a permutation test.
+
+    Args:
+        x: One dimensional array with the independent variable.
+        y: One dimensional array with the dependent variable.
+        num_resamples: Number of bootstrap resamples and of permutations.
+        confidence: Confidence level of the bootstrap intervals.
+        seed: Seed for `np.random.default_rng`, which makes the results
+            reproducible.
+
+    Returns:
+        The fitted regression along with its resampled statistics.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if x.shape != y.shape or x.ndim != 1:
+        raise ValueError(
+            f"Expected 1D arrays of the same shape, got {x.shape} and "
+            f"{y.shape}."
+        )
+
+    rng = np.random.default_rng(seed)
+    num_samples = x.shape[0]
+    slope, intercept, rvalue = batched_linregress(x, y)
+
+    boot_idx = bootstrap_indices(rng, num_samples, num_resamples)
+    boot_slope, boot_intercept, boot_rvalue = batched_linregress(
+        x[boot_idx], y[boot_idx]
+    )
+
+    # Permuting `y` alone breaks any association with `x`.
+    perm_idx = permutation_indices(rng, num_samples, num_resamples)
+    _, _, perm_rvalue = batched_linregress(
+        np.broadcast_to(x, perm_idx.shape), y[perm_idx]
+    )
+    # A NaN correlation can't be tested, and NaN permutations (constant
+    # resampled values) carry no evidence either way.
+    perm_rvalue = perm_rvalue[~np.isnan(perm_rvalue)]
+    if np.isfinite(rvalue) and perm_rvalue.size:
+        num_extreme = np.count_nonzero(np.abs(perm_rvalue) >= np.abs(rvalue))
+        pvalue = (num_extreme + 1) / (perm_rvalue.size + 1)
+    else:
+        pvalue = np.nan
+
+    return ResampledRegression(
+        slope=float(slope),
+        intercept=float(intercept),
+        rvalue=float(rvalue),
+        slope_ci=_percentile_interval(boot_slope, confidence),
+        intercept_ci=_percentile_interval(boot_intercept, confidence),
+        rvalue_ci=_percentile_interval(boot_rvalue, confidence),
+        pvalue=float(pvalue),
+    )
+
+
+def _resample_linregress_star(
+    args: Tuple[np.ndarray, np.ndarray, Seed],
+    num_resamples: int,
+    confidence: float,
+) -> ResampledRegression:
+    """Unpack `args` into `resample_linregress`, for use with `map`."""
+    x, y, seed = args
+    return resample_linregress(x, y, num_resamples, confidence, seed)
+
+
+def resample_linregress_many(
+    samples: Sequence[Tuple[np.ndarray, np.ndarray]],
+    seeds: Sequence[Seed],
+    num_resamples: int = 10_000,
+    confidence: float = 0.95,
+    num_workers: int = 1,
+) -> List[ResampledRegression]:
+    """Run `resample_linregress` for every `(x, y)` pair in `samples`.
+
+    Each pair is resampled with its own seed, so results do not depend on
+    `num_workers` nor on the order in which pairs are scheduled.
+
+    Args:
+        samples: The `(x, y)` pairs to regress.
+        seeds: One seed per pair in `samples`.
+        num_resamples: Number of bootstrap resamples and of permutations.
+        confidence: Confidence level of the bootstrap intervals.
+        num_workers: Number of worker processes. If 1, run in this process.
+
+    Returns:
+        The resampled regressions, in the same order as `samples`.
+    """
+    if len(samples) != len(seeds):
+        raise ValueError(f"Got {len(samples)} samples but {len(seeds)} seeds.")
+
+    fn = partial(
+        _resample_linregress_star,
+        num_resamples=num_resamples,
+        confidence=confidence,
+    )
+    tasks = [(x, y, seed) for (x, y), seed in zip(samples, seeds)]
+    if num_workers <= 1:
+        return list(map(fn, tasks))
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        return list(executor.map(fn, tasks))
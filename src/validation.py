@@ -0,0 +1,352 @@
+"""Declarative schemas and vectorized validation for assets dataframes.
+
+Each asset declares an `AssetSchema` next to its loader, which validates the
+dataframe once, right after reading it, so malformed inputs fail before any
+expensive parsing or analysis runs on top of them.
+"""
+import re
+from enum import Enum
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Matches integers written with '.' as the thousands separator (pt_BR).
+PT_BR_INTEGER_PATTERN = r"\d{1,3}(?:\.\d{3})*"
+
+# Maximum number of offending values quoted for each violation.
+MAX_EXAMPLES = 3
+
+
+class ColumnType(Enum):
+    """Types a column may be declared as in a `ColumnSchema`."""
+
+    INTEGER = "integer"
+    FLOAT = "float"
+    STRING = "string"
+    PT_BR_INTEGER = "pt_br_integer"
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+
+class ColumnSchema(NamedTuple):
+    """Expected contents of a single column.
+
+    Attributes:
+        dtype: Type every non-missing value must have.
+        nullable: Whether missing values (including the NA markers of the
+            asset) are allowed.
+        min_value: Inclusive lower bound for numeric columns.
+        max_value: Inclusive upper bound for numeric columns.
+        allowed_values: If given, the only values allowed in the column.
+        pattern: If given, a regex every string value must fully match.
+    """
+
+    dtype: ColumnType
+    nullable: bool = False
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    allowed_values: Optional[FrozenSet[Any]] = None
+    pattern: Optional[str] = None
+
+
+class AssetSchema(NamedTuple):
+    """Expected layout of an asset dataframe.
+
+    Attributes:
+        name: Name of the asset, used in reports.
+        columns: Schema of each required column or index level, by name.
+        year_columns: Schema shared by every column named after a year.
+        year_column_pattern: Regex fully matching the names of year columns,
+            with the year as its first group. Year columns must be sorted.
+        min_year: Inclusive lower bound for the year columns.
+        max_year: Inclusive upper bound for the year columns.
+        na_values: Markers standing for missing values in the raw asset.
+        unique_key: Columns or index levels that must uniquely identify rows.
+        allow_extra_columns: Whether columns not covered by the schema are
+            allowed.
+    """
+
+    name: str
+    columns: Dict[str, ColumnSchema]
+    year_columns: Optional[ColumnSchema] = None
+    year_column_pattern: str = r"(\d{4})"
+    min_year: Optional[int] = None
+    max_year: Optional[int] = None
+    na_values: Tuple[str, ...] = ()
+    unique_key: Tuple[str, ...] = ()
+    allow_extra_columns: bool = False
+
+
+class SchemaViolation(NamedTuple):
+    """A failed check, with the number of offending rows and a few examples."""
+
+    column: str
+    check: str
+    num_rows: int
+    examples: Tuple[Any, ...] = ()
+
+    def __str__(self) -> str:
+        if not self.examples:
+            return f"{self.column}: {self.check}"
+        examples = ", ".join(repr(example) for example in self.examples)
+        return (
+            f"{self.column}: {self.check} "
+            f"({self.num_rows} rows, e.g. {examples})"
+        )
+
+
+class SchemaError(ValueError):
+    """Raised when an asset does not conform to its schema."""
+
+
+class ValidationReport(NamedTuple):
+    """Outcome of validating a dataframe against an `AssetSchema`."""
+
+    schema_name: str
+    num_rows: int
+    violations: List[SchemaViolation]
+
+    @property
+    def ok(self) -> bool:
+        """Whether the dataframe passed every check."""
+        return not self.violations
+
+    def __str__(self) -> str:
+        lines = [
+            f"{self.schema_name}: {self.num_rows} rows, "
+            f"{len(self.violations)} violations"
+        ]
+        lines.extend(f"  {violation}" for violation in self.violations)
+        return "\n".join(lines)
+
+    def raise_if_invalid(self) -> None:
+        """Raise a `SchemaError` with the report if any check failed.
+
+        Raises:
+            SchemaError: If there is at least one violation.
+        """
+        if not self.ok:
+            raise SchemaError(str(self))
+
+
+def _violation(
+    column: str, check: str, values: pd.Series
+) -> Optional[SchemaViolation]:
+    """Return a violation for the offending `values`, if there are any."""
+    if values.empty:
+        return None
+    examples = tuple(values.drop_duplicates().head(MAX_EXAMPLES).tolist())
+    return SchemaViolation(column, check, len(values), examples)
+
+
+def _numeric_values(
+    values: pd.Series, dtype: ColumnType
+) -> Tuple[pd.Series, pd.Series]:
+    """Cast non-missing `values` to floats, flagging the ones that fail.
+
+    Returns:
+        The numeric values, with NaN wherever the cast failed, and a boolean
+        mask of the values that could not be cast to `dtype`.
+    """
+    if dtype is ColumnType.PT_BR_INTEGER:
+        as_str = values.astype(str)
+        invalid = ~as_str.str.fullmatch(PT_BR_INTEGER_PATTERN)
+        numeric = pd.to_numeric(
+            as_str.str.replace(".", "", regex=False).where(~invalid),
+            errors="coerce",
+        )
+        return numeric, invalid
+
+    numeric = pd.to_numeric(values, errors="coerce")
+    invalid = numeric.isna()
+    if dtype is ColumnType.INTEGER:
+        invalid |= np.mod(numeric, 1) != 0
+    return numeric, invalid
+
+
+def validate_column(
+    name: str,
+    column: pd.Series,
+    schema: ColumnSchema,
+    na_values: Tuple[str, ...] = (),
+) -> List[SchemaViolation]:
+    """Check every value in `column` against `schema` at once."""
+    missing = column.isna() | column.isin(na_values)
+    violations = []
+    if not schema.nullable:
+        violations.append(_violation(name, "missing", column[missing]))
+
+    values = column[~missing]
+    if schema.dtype is ColumnType.STRING:
+        numeric = None
+        if schema.pattern is not None:
+            matches = values.astype(str).str.fullmatch(schema.pattern)
+            violations.append(
+                _violation(
+                    name, f"not matching {schema.pattern}", values[~matches]
+                )
+            )
+    else:
+        numeric, invalid = _numeric_values(values, schema.dtype)
+        violations.append(
+            _violation(name, f"not {schema.dtype}", values[invalid])
+        )
+
+    if schema.allowed_values is not None:
+        violations.append(
+            _violation(
+                name,
+                "not an allowed value",
+                values[~values.isin(schema.allowed_values)],
+            )
+        )
+    if numeric is not None and schema.min_value is not None:
+        violations.append(
+            _violation(
+                name,
+                f"below {schema.min_value}",
+                values[numeric < schema.min_value],
+            )
+        )
+    if numeric is not None and schema.max_value is not None:
+        violations.append(
+            _violation(
+                name,
+                f"above {schema.max_value}",
+                values[numeric > schema.max_value],
+            )
+        )
+    return [violation for violation in violations if violation is not None]
+
+
+def _year_column_violations(
+    years: np.ndarray, schema: AssetSchema
+) -> List[SchemaViolation]:
+    """Check the years in the names of the year columns of the asset."""
+    if not years.size:
+        return [SchemaViolation("<columns>", "no years", 0)]
+
+    violations = []
+    out_of_range = np.zeros_like(years, dtype=bool)
+    if schema.min_year is not None:
+        out_of_range |= years < schema.min_year
+    if schema.max_year is not None:
+        out_of_range |= years > schema.max_year
+    if out_of_range.any():
+        violations.append(
+            SchemaViolation(
+                "<columns>",
+                f"year outside [{schema.min_year}, {schema.max_year}]",
+                int(out_of_range.sum()),
+                tuple(years[out_of_range][:MAX_EXAMPLES].tolist()),
+            )
+        )
+    unsorted = np.diff(years) <= 0
+    if unsorted.any():
+        violations.append(
+            SchemaViolation(
+                "<columns>",
+                "years not sorted",
+                int(unsorted.sum()),
+                tuple(years[1:][unsorted][:MAX_EXAMPLES].tolist()),
+            )
+        )
+    return violations
+
+
+def _column_set_violations(
+    columns: List[str], year_columns: List[str], schema: AssetSchema
+) -> List[SchemaViolation]:
+    """Check that `columns` has the columns required by `schema`, only."""
+    missing_columns = [col for col in schema.columns if col not in columns]
+    extra_columns = []
+    if not schema.allow_extra_columns:
+        expected = set(schema.columns)
+        if schema.year_columns is not None:
+            expected.update(year_columns)
+        extra_columns = [col for col in columns if col not in expected]
+
+    return [
+        SchemaViolation(
+            "<columns>", check, len(cols), tuple(cols[:MAX_EXAMPLES])
+        )
+        for check, cols in (
+            ("missing", missing_columns),
+            ("unexpected", extra_columns),
+        )
+        if cols
+    ]
+
+
+def _unique_key_violations(
+    flat_df: pd.DataFrame, unique_key: Tuple[str, ...]
+) -> List[SchemaViolation]:
+    """Check that the `unique_key` columns identify each row of `flat_df`."""
+    if not unique_key or not all(col in flat_df for col in unique_key):
+        return []
+
+    key = flat_df[list(unique_key)]
+    duplicated = key.duplicated(keep=False)
+    if not duplicated.any():
+        return []
+    examples = (
+        key[duplicated]
+        .drop_duplicates()
+        .head(MAX_EXAMPLES)
+        .itertuples(index=False, name=None)
+    )
+    return [
+        SchemaViolation(
+            ", ".join(unique_key),
+            "not unique",
+            int(duplicated.sum()),
+            tuple(examples),
+        )
+    ]
+
+
+def validate_df(df: pd.DataFrame, schema: AssetSchema) -> ValidationReport:
+    """Validate `df`, including its index levels, against `schema`.
+
+    Index levels are checked as if they were columns, so schemas don't depend
+    on which columns a loader chooses to use as the index.
+    """
+    flat_df = df.reset_index() if any(df.index.names) else df
+    flat_df = flat_df.rename(columns=str)
+
+    year_matches = [
+        match
+        for match in (
+            re.fullmatch(schema.year_column_pattern, col) for col in flat_df
+        )
+        if match
+    ]
+    year_columns = [match.string for match in year_matches]
+
+    violations = []
+    column_schemas = {
+        col: col_schema
+        for col, col_schema in schema.columns.items()
+        if col in flat_df
+    }
+    if schema.year_columns is not None:
+        years = np.array(
+            [match.group(1) for match in year_matches], dtype=np.int64
+        )
+        violations.extend(_year_column_violations(years, schema))
+        column_schemas.update(
+            (col, schema.year_columns) for col in year_columns
+        )
+    violations.extend(
+        _column_set_violations(list(flat_df), year_columns, schema)
+    )
+
+    for col, col_schema in column_schemas.items():
+        violations.extend(
+            validate_column(col, flat_df[col], col_schema, schema.na_values)
+        )
+
+    violations.extend(_unique_key_violations(flat_df, schema.unique_key))
+    return ValidationReport(schema.name, len(df), violations)
@@ -1,6 +1,7 @@
 """Find interesting correlations between data."""
 from math import ceil
 from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Tuple
 
 import matplotlib as mpl
 import matplotlib.pyplot as plt
@@ -14,7 +15,11 @@ from src.assets_utils import (
     ideb_capital_csv_filename,
     ideb_capital_df_from_csv,
 )
-from src.consts import HOMICIDES_PER_CAPITA_PER_CAPITAL_FILENAME
+from src.consts import (
+    CORRELATION_RESAMPLING_FILENAME,
+    HOMICIDES_PER_CAPITA_PER_CAPITAL_FILENAME,
+)
+from src.resampling import ResampledRegression, resample_linregress_many
 from src.utils import default_parser
 
 
@@ -54,12 +59,66 @@ def plot_linear_regression_ideb_vs_homicides(
     ax.legend(loc="upper right")
 
 
-def correlate_ideb_with_homicides(
+def annotate_resampled_regression(
+    ax: mpl.axes.Axes, resampled: ResampledRegression
+) -> None:
+    """Annotate the bootstrap slope CI and permutation p-value on `ax`."""
+    slope_lb, slope_ub = resampled.slope_ci
+    ax.annotate(
+        rf"slope CI $[{slope_lb:.1f}, {slope_ub:.1f}]$, "
+        rf"$p_{{perm}} = {resampled.pvalue:.3f}$",
+        xy=(0.03, 0.8),
+        xycoords="axes fraction",
+    )
+
+
+class IdebHomicidesPair(NamedTuple):
+    """IDEB scores for one year and homicides per 100,000 for a later year."""
+
+    school_level: SchoolLevel
+    network: EducationNetwork
+    ideb_year: int
+    homicide_year: int
+    ideb: pd.Series
+    homicides: pd.Series
+
+    def seed(self, base_seed: int) -> List[int]:
+        """Return a seed that only depends on `base_seed` and the pair's key."""
+        return [
+            base_seed,
+            list(SchoolLevel).index(self.school_level),
+            list(EducationNetwork).index(self.network),
+            self.ideb_year,
+            self.homicide_year,
+        ]
+
+    def to_record(self, resampled: ResampledRegression) -> Dict[str, Any]:
+        """Return the pair's key and `resampled` statistics as a flat dict."""
+        return {
+            "school_level": self.school_level.name.lower(),
+            "network": self.network.name.lower(),
+            "ideb_year": self.ideb_year,
+            "homicide_year": self.homicide_year,
+            "num_samples": len(self.ideb),
+            "slope": resampled.slope,
+            "slope_lb": resampled.slope_ci[0],
+            "slope_ub": resampled.slope_ci[1],
+            "intercept": resampled.intercept,
+            "intercept_lb": resampled.intercept_ci[0],
+            "intercept_ub": resampled.intercept_ci[1],
+            "rvalue": resampled.rvalue,
+            "rvalue_lb": resampled.rvalue_ci[0],
+            "rvalue_ub": resampled.rvalue_ci[1],
+            "pvalue": resampled.pvalue,
+        }
+
+
+def ideb_vs_homicides_pairs(
     outputs_dir: Path,
     school_level: SchoolLevel = SchoolLevel.MIDDLE,
     network: EducationNetwork = EducationNetwork.PUBLIC,
-) -> None:
-    """Correlate IDEB data for `school_level` and `network` with homicides."""
+) -> List[IdebHomicidesPair]:
+    """Return every pair of IDEB year and later homicide year to correlate."""
     homicides_per_capita_df = pd.read_pickle(
         outputs_dir / HOMICIDES_PER_CAPITA_PER_CAPITAL_FILENAME
     )
@@ -67,35 +126,56 @@ def correlate_ideb_with_homicides(
         outputs_dir, school_level, network
     )
     ideb_capital_df.columns = ideb_capital_df.columns.astype(np.int64)
+    pairs = []
     for ideb_year in ideb_capital_df:
-        ideb_capital_for_year = ideb_capital_df[ideb_year]
-        ideb_capital_for_year.dropna(inplace=True)
+        ideb_capital_for_year = ideb_capital_df[ideb_year].dropna()
 
         homicides_per_capita_from_years = homicides_per_capita_df.loc[
             ideb_capital_for_year.index, ideb_year:
         ]
+        for homicide_year in homicides_per_capita_from_years:
+            pairs.append(
+                IdebHomicidesPair(
+                    school_level,
+                    network,
+                    ideb_year,
+                    homicide_year,
+                    ideb_capital_for_year,
+                    homicides_per_capita_from_years[homicide_year] * 1e5,
+                )
+            )
+    return pairs
 
-        num_plots = homicides_per_capita_from_years.shape[1]
-
-        if not num_plots:
-            continue
 
-        nrows = ceil(num_plots / 2)
+def plot_ideb_vs_homicides(
+    outputs_dir: Path,
+    pairs: List[IdebHomicidesPair],
+    resampled: List[ResampledRegression],
+) -> None:
+    """Plot one figure per IDEB year, level and network with all its pairs."""
+    figure_pairs: Dict[
+        Tuple[int, SchoolLevel, EducationNetwork],
+        List[Tuple[IdebHomicidesPair, ResampledRegression]],
+    ] = {}
+    for pair, res in zip(pairs, resampled):
+        figure_key = (pair.ideb_year, pair.school_level, pair.network)
+        figure_pairs.setdefault(figure_key, []).append((pair, res))
+
+    for (ideb_year, school_level, network), plots in figure_pairs.items():
+        nrows = ceil(len(plots) / 2)
         fig, axes = plt.subplots(
             nrows=nrows, ncols=2, figsize=(10, nrows * 3), squeeze=False
         )
-        for idx, homicide_year in enumerate(homicides_per_capita_from_years):
+        for idx, (pair, res) in enumerate(plots):
             ax = axes[idx // 2, idx % 2]
-            homicides_per_capita_for_year = homicides_per_capita_from_years[
-                homicide_year
-            ]
             plot_linear_regression_ideb_vs_homicides(
                 ax,
-                ideb_capital_for_year,
-                homicides_per_capita_for_year * 1e5,
-                ideb_year,
-                homicide_year,
+                pair.ideb,
+                pair.homicides,
+                pair.ideb_year,
+                pair.homicide_year,
             )
+            annotate_resampled_regression(ax, res)
         fig.tight_layout()
         fig.savefig(
             outputs_dir
@@ -108,19 +188,61 @@ def correlate_ideb_with_homicides(
         plt.close(fig)
 
 
-def correlate(assets_dir: Path, outputs_dir: Path) -> None:
-    """Plot correlations between relevant data."""
+def correlate(
+    assets_dir: Path,
+    outputs_dir: Path,
+    num_resamples: int = 10_000,
+    num_workers: int = 1,
+    seed: int = 0,
+) -> None:
+    """Plot correlations between relevant data.
+
+    Pairs from every school level and network are resampled in a single
+    batch, so a single process pool is shared by all of them.
+    """
+    pairs = []
     for school_level in SchoolLevel:
         for network in EducationNetwork:
             ideb_filepath = outputs_dir / ideb_capital_csv_filename(
                 school_level, network
             )
             if ideb_filepath.is_file():
-                correlate_ideb_with_homicides(
-                    outputs_dir, school_level, network
+                pairs.extend(
+                    ideb_vs_homicides_pairs(outputs_dir, school_level, network)
                 )
+    if not pairs:
+        return
+
+    resampled = resample_linregress_many(
+        [(pair.ideb, pair.homicides) for pair in pairs],
+        [pair.seed(seed) for pair in pairs],
+        num_resamples=num_resamples,
+        num_workers=num_workers,
+    )
+    plot_ideb_vs_homicides(outputs_dir, pairs, resampled)
+    pd.DataFrame.from_records(
+        [pair.to_record(res) for pair, res in zip(pairs, resampled)]
+    ).to_csv(outputs_dir / CORRELATION_RESAMPLING_FILENAME, index=False)
 
 
 if __name__ == "__main__":
     parser = default_parser()
+    parser.add_argument(
+        "--num_resamples",
+        default=10_000,
+        type=int,
+        help="Number of bootstrap resamples and permutations per regression.",
+    )
+    parser.add_argument(
+        "--num_workers",
+        default=1,
+        type=int,
+        help="Number of worker processes used for resampling.",
+    )
+    parser.add_argument(
+        "--seed",
+        default=0,
+        type=int,
+        help="Base seed for reproducible resampling.",
+    )
     correlate(**vars(parser.parse_args()))